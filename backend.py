@@ -9,14 +9,24 @@
 #           optional reset-between-hits, sequence match -> key output, JSON persistence.
 #
 # Run: python sample_app.py
-# Requires: pip install pynput platformdirs  (optional macOS overlay: pip install pyobjc)
+# Requires: pip install pynput platformdirs  (optional macOS overlay: pip install pyobjc;
+#           optional faster JSON: pip install orjson)
 
-import json, math, queue, time, re, sys
+import math, random, threading, time, re, sys
+from bisect import bisect_left, insort
 from collections import deque
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from pathlib import Path
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
+
+messagebox = None
+def _mb():
+    # Dialogs are rare (bad input, import errors): import tkinter.messagebox on first use.
+    global messagebox
+    if messagebox is None:
+        import tkinter.messagebox as messagebox
+    return messagebox
 
 # Optional features gated on pynput availability
 HAVE_PYNPUT = True
@@ -25,6 +35,28 @@ try:
 except Exception:
     HAVE_PYNPUT = False
 
+# Optional orjson for config/macro JSON (stdlib json fallback); both produce bytes
+import json
+try:
+    import orjson
+    def _dumps(obj) -> bytes:
+        payload = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        # orjson writes inf/nan as null. Our data never holds None, so on any
+        # "null" (worst case just text in a name) let stdlib json write it instead,
+        # which keeps Infinity/NaN round-trippable.
+        if b"null" in payload:
+            return json.dumps(obj, indent=2).encode("utf-8")
+        return payload
+    def _loads(data: bytes):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)   # e.g. Infinity/NaN tokens orjson rejects
+except Exception:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    _loads = json.loads
+
 # Platformdirs for config path (fall back to home if missing)
 # ---- robust, cross-platform config dir selection ----
 import os, sys
@@ -76,6 +108,17 @@ CX, CY = W // 2, H // 2
 BAND_X = 24
 BAND_Y = 24
 
+# Single clock for every interval/timestamp (engine, pump, schedulers): monotonic,
+# so wall-clock jumps can't fake inactivity or skew speeds.
+_now = time.monotonic_ns
+
+# The pump runs at 60 Hz; trace/HUD redraws are capped to every other pump
+# (~30 Hz). The cap sits 2 ms under two periods because _reschedule rounds
+# delays down to whole ms, so consecutive pumps can land slightly early.
+PUMP_NS = 1_000_000_000 // 60
+UI_REDRAW_NS = 2 * PUMP_NS - 2_000_000
+INFO_NS = 200_000_000
+
 # ----------------------------- Data models -----------------------------
 
 @dataclass
@@ -88,7 +131,7 @@ class Settings:
     require_reset_between_hits: bool = False  # cursor must pass through reset circle before next hit
     trace_len: int = 30                     # segments kept in draw trace
     use_global_mouse: bool = True            # always-global default
-    angle_mode: str = "axis"                 # "axis" uses abs(dx)>abs(dy) heuristic
+    angle_mode: str = "axis"                 # legacy; direction is always abs(dx)>abs(dy) now
     inactivity_reset_ms: int = 150           # recenter virtual cursor if no deliberate motion
 
 @dataclass
@@ -96,17 +139,23 @@ class Macro:
     pattern: list[str]   # e.g., ["U","U","D"]
     key: str             # e.g., "b", "esc", "ctrl+a", "cmd+c, cmd+v"
     name: str = ""
+    # runtime only: key compiled to a press/tap/release script (App._compile_output)
+    _compiled: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
+def _macro_to_dict(m: Macro) -> dict:
+    return {"pattern": list(m.pattern), "key": m.key, "name": m.name}
 
 @dataclass
 class Store:
     settings: Settings
     macros: list[Macro]
+    _last_saved: bytes = field(default=b"", init=False, repr=False, compare=False)
 
     @staticmethod
     def load() -> "Store":
         if CONF_FILE.exists():
             try:
-                data = json.loads(CONF_FILE.read_text(encoding="utf-8"))
+                data = _loads(CONF_FILE.read_bytes())
                 s = Settings(**data.get("settings", {}))
                 ms = [Macro(**m) for m in data.get("macros", [])]
                 return Store(settings=s, macros=ms)
@@ -115,32 +164,151 @@ class Store:
         return Store(settings=Settings(), macros=[])
 
     def save(self):
+        # Flat models: copy fields directly instead of asdict()'s deep walk.
         data = {
-            "settings": asdict(self.settings),
-            "macros": [asdict(m) for m in self.macros],
+            "settings": dict(vars(self.settings)),
+            "macros": [_macro_to_dict(m) for m in self.macros],
         }
-        CONF_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        payload = _dumps(data)
+        if payload == self._last_saved:
+            return  # unchanged since our last write
+        # write-then-rename so a crash mid-save never leaves a truncated config
+        tmp = CONF_FILE.with_suffix(".json.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, CONF_FILE)
+        self._last_saved = payload
 
 # ----------------------------- Gesture Engine -----------------------------
 
+# Direction codes used inside the engine; letters only at the UI/config boundary.
+DIR_U, DIR_R, DIR_D, DIR_L = 0, 1, 2, 3
+DIR_CHARS = "URDL"
+_DIR_CODE = {c: i for i, c in enumerate(DIR_CHARS)}
+_NOT_DIR_RE = re.compile(r"[^URDL]+")   # strips everything but direction letters
+
+_RING = 64              # engine sample ring size (power of two)
+_RING_MASK = _RING - 1
+
+def _dir_step(v_med, xs, ys, head, speed_th, w, h, band_x, band_y):
+    """
+    Direction/band kernel over the engine's sample ring (flat args, no self).
+    Needs at least 6 samples in the ring. Returns (fast, direction, accept):
+      - fast: the median speed reached speed_th (drives inactivity recentering),
+      - direction: None unless fast and the newest sample is in an edge band,
+      - accept: the newest sample sits in that direction's band.
+    """
+    if v_med < speed_th:
+        return False, None, False
+
+    i = (head - 1) & _RING_MASK
+    x5, y5 = xs[i], ys[i]
+    # Away from every band a hit is impossible: skip direction work entirely.
+    if band_x < x5 < w - band_x and band_y < y5 < h - band_y:
+        return True, None, False
+
+    # Direction from the three oldest deltas of the 6-sample window (as before).
+    i0 = (head - 6) & _RING_MASK
+    i3 = (head - 3) & _RING_MASK
+    dx_sum, dy_sum = xs[i3] - xs[i0], ys[i3] - ys[i0]
+
+    # 4-way quantization by dominant axis (no trig needed for U/R/D/L).
+    if abs(dx_sum) > abs(dy_sum):
+        dirc = DIR_R if dx_sum > 0 else DIR_L
+    else:
+        dirc = DIR_D if dy_sum > 0 else DIR_U
+
+    if dirc == DIR_U:   accept = y5 <= band_y
+    elif dirc == DIR_D: accept = y5 >= h - band_y
+    elif dirc == DIR_L: accept = x5 <= band_x
+    else:               accept = x5 >= w - band_x
+    return True, dirc, accept
+
+def _build_macro_dfa(macros: list[Macro]) -> list[list]:
+    """
+    Aho-Corasick automaton over U/R/D/L for the macro patterns, completed into a
+    DFA: dfa[state][dir_code] -> (next_state, macro or None). The macro is the
+    first listed one whose pattern is a suffix of the input so far, matching the
+    old in-order suffix scan. Patterns must be lists of single "U"/"R"/"D"/"L"
+    strings; empty or malformed ones (strings, "", "UR", ...) never match.
+    """
+    goto: list[dict] = [{}]
+    out: list[int | None] = [None]   # earliest macro index ending exactly here
+    for idx, m in enumerate(macros):
+        if not isinstance(m.pattern, list) or not m.pattern:
+            continue
+        codes = [_DIR_CODE.get(c) if isinstance(c, str) else None for c in m.pattern]
+        if None in codes:
+            continue
+        st = 0
+        for d in codes:
+            nxt = goto[st].get(d)
+            if nxt is None:
+                nxt = len(goto)
+                goto[st][d] = nxt
+                goto.append({}); out.append(None)
+            st = nxt
+        if out[st] is None:
+            out[st] = idx
+
+    # BFS over the trie: failure links, output inheritance, full transitions.
+    fail = [0] * len(goto)
+    trans = [[0] * 4 for _ in goto]
+    todo = deque()
+    for d in range(4):
+        nxt = goto[0].get(d, 0)
+        trans[0][d] = nxt
+        if nxt:
+            todo.append(nxt)
+    while todo:
+        st = todo.popleft()
+        f = fail[st]
+        if out[f] is not None and (out[st] is None or out[f] < out[st]):
+            out[st] = out[f]
+        for d in range(4):
+            nxt = goto[st].get(d)
+            if nxt is None:
+                trans[st][d] = trans[f][d]
+            else:
+                fail[nxt] = trans[f][d]
+                trans[st][d] = nxt
+                todo.append(nxt)
+
+    return [
+        [(nxt, macros[out[nxt]] if out[nxt] is not None else None) for nxt in row]
+        for row in trans
+    ]
+
 class GestureEngine:
     """
-    Consumes cursor samples (t, x, y) in canvas coordinates.
+    Consumes cursor samples (t, x, y) in canvas coordinates; t is _now() (monotonic ns).
     Emits direction hits when:
       - median speed >= threshold,
       - cursor is inside the edge band for that direction,
       - optional reset-circle requirement satisfied,
       - debounce observed.
     Tracks last deliberate-activity time to support inactivity recentering.
+    Pure Python, no Tk: the App drives it from the mouse listener thread, so
+    on_hit/on_match run there too.
     """
     def __init__(self, settings: Settings, on_hit, on_match):
         self.s = settings
         self.on_hit = on_hit
         self.on_match = on_match
 
-        self.samples = deque(maxlen=64)  # (t, x, y)
-        self.seq: list[str] = []
-        self.last_accept_ts = 0.0
+        # Sample ring as parallel arrays (t / x / y); _head is the next write slot.
+        self._buf_t = [0] * _RING
+        self._buf_x = [0] * _RING
+        self._buf_y = [0] * _RING
+        self._head = 0
+        self._len = 0
+        # Online median of the last 5 sample-to-sample speeds: arrival order plus
+        # a sorted copy kept with bisect, so the median is just _speed_sorted[2].
+        self._speed_win: deque[float] = deque()
+        self._speed_sorted: list[float] = []
+        self.seq: deque[int] = deque(maxlen=16)   # recent hit codes, for the info line only
+        self._dfa: list[list] = _build_macro_dfa([])
+        self._state = 0
+        self.last_accept_ts = 0
         self.inside_reset = False
         self.need_reset = False
 
@@ -149,129 +317,159 @@ class GestureEngine:
         self.speed_median = 0.0
 
         # Activity markers
-        self.last_above_threshold_ts = 0.0
-        self.last_sample_ts = 0.0
+        self.last_above_threshold_ts = 0
+        self.last_sample_ts = 0
 
         self.macros: list[Macro] = []
+        self._recompute_cached()
 
     def update_settings(self, s: Settings):
         self.s = s
+        self._recompute_cached()
+
+    def _recompute_cached(self):
+        """Snapshot settings and canvas metrics into plain attributes read by push()."""
+        s = self.s
+        self._speed_th = float(s.speed_threshold_px_s)
+        self._debounce_ns = int(s.debounce_ms) * 1_000_000
+        # Right after a hit no new hit can pass debounce, so detection is skipped.
+        # Capped at half the inactivity window so last_above_threshold_ts keeps
+        # refreshing and the virtual cursor is not recentered mid-gesture.
+        self._skip_ns = min(self._debounce_ns, int(s.inactivity_reset_ms) * 500_000)
+        self._reset_r2 = s.reset_radius_px ** 2
+        self._require_reset = bool(s.require_reset_between_hits)
+        self._w, self._h = W, H
+        self._cx, self._cy = CX, CY
+        self._band_x, self._band_y = BAND_X, BAND_Y
 
     def set_macros(self, macros: list[Macro]):
         self.macros = macros
-
-    def reset(self, t: float | None = None):
-        self.samples.clear()
+        self._dfa = _build_macro_dfa(macros)
+        self._state = 0
+
+    def reset(self, t: int | None = None):
+        self._head = 0
+        self._len = 0
+        self._speed_win.clear()
+        self._speed_sorted.clear()
         self.seq.clear()
+        self._state = 0
         self.last_dir = None
         self.speed_median = 0.0
         self.inside_reset = False
         self.need_reset = False
         if t is None:
-            t = time.time()
-        self.last_accept_ts = 0.0
-        self.last_above_threshold_ts = 0.0
+            t = _now()
+        self.last_accept_ts = 0
+        self.last_above_threshold_ts = 0
         self.last_sample_ts = t
 
-    @staticmethod
-    def _median(vals):
-        if not vals:
-            return 0.0
-        v = sorted(vals)
-        n = len(v)
-        m = n // 2
-        if n % 2:
-            return v[m]
-        return 0.5 * (v[m-1] + v[m])
-
-    def _compute_speed_and_dir(self):
-        if len(self.samples) < 3:
-            return 0.0, None, (0.0, 0.0)
-
-        speeds, dxs, dys = [], [], []
-        for i in range(1, min(6, len(self.samples))):
-            t0, x0, y0 = self.samples[-i-1]
-            t1, x1, y1 = self.samples[-i]
-            dt = max(1e-4, t1 - t0)
-            dx, dy = (x1 - x0), (y1 - y0)
-            v = math.hypot(dx, dy) / dt
-            speeds.append(v)
-            dxs.append(dx); dys.append(dy)
-
-        v_med = self._median(speeds)
-        dx_sum = sum(dxs[-3:])
-        dy_sum = sum(dys[-3:])
-
-        if self.s.angle_mode == "axis":
-            if abs(dx_sum) > abs(dy_sum):
-                dirc = "R" if dx_sum > 0 else "L"
-            else:
-                dirc = "D" if dy_sum > 0 else "U"
-        else:
-            ang = math.degrees(math.atan2(-dy_sum, dx_sum))  # y up
-            a = (ang + 360) % 360
-            if a <= 45 or a > 315: dirc = "R"
-            elif a <= 135:         dirc = "U"
-            elif a <= 225:         dirc = "L"
-            else:                  dirc = "D"
-
-        return v_med, dirc, (dx_sum, dy_sum)
-
-    def _in_band(self, x, y, d: str) -> bool:
-        ax, ay = BAND_X, BAND_Y
-        if d == "U":  return y <= ay
-        if d == "D":  return y >= (H - ay)
-        if d == "L":  return x <= ax
-        if d == "R":  return x >= (W - ax)
-        return False
-
     def _inside_reset_circle(self, x, y) -> bool:
-        return (x - CX)**2 + (y - CY)**2 <= (self.s.reset_radius_px**2)
-
-    def push(self, t, x, y):
-        self.last_sample_ts = t
+        dx = x - self._cx
+        dy = y - self._cy
+        return dx*dx + dy*dy <= self._reset_r2
 
+    def _append(self, t, x, y):
         was = self.inside_reset
         self.inside_reset = self._inside_reset_circle(x, y)
         if self.inside_reset and not was:
-            if self.s.require_reset_between_hits:
+            if self._require_reset:
                 self.need_reset = False
 
-        self.samples.append((t, x, y))
-        v, d, _ = self._compute_speed_and_dir()
+        h = self._head
+        if self._len:
+            p = (h - 1) & _RING_MASK
+            v = math.hypot(x - self._buf_x[p], y - self._buf_y[p]) * 1e9 / max(100_000, t - self._buf_t[p])
+            win, srt = self._speed_win, self._speed_sorted
+            if len(win) == 5:
+                del srt[bisect_left(srt, win.popleft())]
+            win.append(v)
+            insort(srt, v)
+
+        self._buf_t[h] = t; self._buf_x[h] = x; self._buf_y[h] = y
+        self._head = (h + 1) & _RING_MASK
+        if self._len < _RING:
+            self._len += 1
+
+    def push(self, t, x, y):
+        self.last_sample_ts = t
+        self._append(t, x, y)
+        if t - self.last_accept_ts >= self._skip_ns:
+            self._detect(t)
+
+    def _detect(self, t):
+        srt = self._speed_sorted
+        if len(srt) < 5:   # fixed 5-speed (6-sample) window not filled yet
+            self.speed_median = 0.0
+            return
+        v = srt[2]
+        fast, d, accept = _dir_step(
+            v, self._buf_x, self._buf_y, self._head,
+            self._speed_th, self._w, self._h, self._band_x, self._band_y,
+        )
         self.speed_median = v
-        self.last_dir = d
+        if d is not None:
+            self.last_dir = d   # UI only; left stale while away from the bands
 
-        if d is not None and v >= self.s.speed_threshold_px_s:
+        if fast:
             self.last_above_threshold_ts = t
 
         now = t
-        if d is None or v < self.s.speed_threshold_px_s:
+        if not accept:
             return
 
-        _, xh, yh = self.samples[-1]
-        if not self._in_band(xh, yh, d):
+        if now - self.last_accept_ts < self._debounce_ns:
             return
 
-        if (now - self.last_accept_ts) * 1000.0 < self.s.debounce_ms:
-            return
-
-        if self.s.require_reset_between_hits and self.need_reset:
+        if self._require_reset and self.need_reset:
             return
 
         self.last_accept_ts = now
         self.seq.append(d)
         self.on_hit(d)
 
-        if self.s.require_reset_between_hits:
+        if self._require_reset:
             self.need_reset = True
 
-        if self.macros:
-            for m in self.macros:
-                if len(self.seq) >= len(m.pattern) and self.seq[-len(m.pattern):] == m.pattern:
-                    self.on_match(m)
-                    self.seq.clear()
-                    break
+        self._state, m = self._dfa[self._state][d]
+        if m is not None:
+            self.on_match(m)
+            self.seq.clear()
+            self._state = 0
+
+# ----------------------------- Static overlay -----------------------------
+
+def _static_overlay_image(width, height, cx, cy, rr, bands) -> tk.PhotoImage:
+    """
+    Rasterize the black background, activation bands and 2px reset ring once
+    into a PhotoImage, so the canvas blits one image instead of compositing the
+    vector overlay items on every repaint. `bands` are (x0, y0, x1, y1) boxes.
+    """
+    img = tk.PhotoImage(width=width, height=height)
+    img.put("#000000", to=(0, 0, width, height))
+
+    def fill(color, x0, y0, x1, y1):
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(width, x1), min(height, y1)
+        if x0 < x1 and y0 < y1:
+            img.put(color, to=(x0, y0, x1, y1))
+
+    for box in bands:
+        fill("#003300", *box)
+    # ring = per-row spans of pixels with rr-1 < distance <= rr+1
+    ro, ri = rr + 1, rr - 1
+    for dy in range(-ro, ro + 1):
+        y = cy + dy
+        if not 0 <= y < height:
+            continue
+        xo = int(math.sqrt(ro*ro - dy*dy))
+        if ri > 0 and abs(dy) <= ri:
+            xi = int(math.sqrt(ri*ri - dy*dy))
+            fill("#00FF00", cx - xo, y, cx - xi, y + 1)
+            fill("#00FF00", cx + xi + 1, y, cx + xo + 1, y + 1)
+        else:
+            fill("#00FF00", cx - xo, y, cx + xo + 1, y + 1)
+    return img
 
 # ----------------------------- Mini HUD -----------------------------
 
@@ -288,6 +486,8 @@ class MiniHUD:
             pass
 
         self.target_width = target_width
+        self._bg_image = None
+        self._bg_key = None
         self.scale = 1.0
         self.w = 1
         self.h = 1
@@ -295,6 +495,10 @@ class MiniHUD:
         self.canvas = tk.Canvas(self.win, bg="black", highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
 
+        # Persistent dynamic items; update() only moves them via coords().
+        self._trace_line = self.canvas.create_line(-10, -10, -10, -10, fill="#00AA00", tags="trace")
+        self._cursor_dot = self.canvas.create_oval(-10, -10, -10, -10, outline="", fill="#00FF00", tags="cursor")
+
         self.update_dimensions()
         self.win.protocol("WM_DELETE_WINDOW", self._on_close)
         self._promote_on_macos()
@@ -389,35 +593,36 @@ class MiniHUD:
     def draw_static(self):
         if not self.canvas:
             return
+        rr = self.app.store.settings.reset_radius_px
+        # update_dimensions() runs on every recenter; only re-rasterize on change
+        key = (self.w, self.h, self.scale, rr, W, H)
+        if key == self._bg_key:
+            return
         try:
-            self.canvas.delete("static"); self.canvas.delete("bg")
+            self.canvas.delete("static")
         except Exception:
             pass
-        # simple dark background fill (no main GUI gradient anymore)
-        self.canvas.create_rectangle(0, 0, self.w, self.h, fill="black", outline="", tags="bg")
-        # reset circle
-        rr = self.app.store.settings.reset_radius_px
-        cx, cy = self._sx(CX), self._sy(CY)
-        self.canvas.create_oval(cx-rr*self.scale, cy-rr*self.scale,
-                                cx+rr*self.scale, cy+rr*self.scale,
-                                outline="#00FF00", width=2, tags="static")
-        # activation bands
-        self.canvas.create_rectangle(0, 0, self._sx(W), self._sy(BAND_Y),
-                                     outline="", fill="#003300", tags="static")
-        self.canvas.create_rectangle(0, self._sy(H-BAND_Y), self._sx(W), self._sy(H),
-                                     outline="", fill="#003300", tags="static")
-        self.canvas.create_rectangle(0, 0, self._sx(BAND_X), self._sy(H),
-                                     outline="", fill="#003300", tags="static")
-        self.canvas.create_rectangle(self._sx(W-BAND_X), 0, self._sx(W), self._sy(H),
-                                     outline="", fill="#003300", tags="static")
+        # dark background, activation bands and reset circle as one image
+        bands = (
+            (0, 0, self._sx(W), self._sy(BAND_Y)),
+            (0, self._sy(H-BAND_Y), self._sx(W), self._sy(H)),
+            (0, 0, self._sx(BAND_X), self._sy(H)),
+            (self._sx(W-BAND_X), 0, self._sx(W), self._sy(H)),
+        )
+        self._bg_image = _static_overlay_image(self.w, self.h, self._sx(CX), self._sy(CY),
+                                               int(round(rr * self.scale)), bands)
+        self._bg_key = key
+        self.canvas.create_image(0, 0, anchor="nw", image=self._bg_image, tags="static")
+        # keep the persistent trace/cursor items above the rebuilt overlay
+        self.canvas.tag_lower("static")
 
     def flash_edge(self, d):
         color = "#77FF77"
         r = None
-        if d == "U": r = (0, 0, self._sx(W), self._sy(BAND_Y))
-        if d == "D": r = (0, self._sy(H-BAND_Y), self._sx(W), self._sy(H))
-        if d == "L": r = (0, 0, self._sx(BAND_X), self._sy(H))
-        if d == "R": r = (self._sx(W-BAND_X), 0, self._sx(W), self._sy(H))
+        if d == DIR_U: r = (0, 0, self._sx(W), self._sy(BAND_Y))
+        if d == DIR_D: r = (0, self._sy(H-BAND_Y), self._sx(W), self._sy(H))
+        if d == DIR_L: r = (0, 0, self._sx(BAND_X), self._sy(H))
+        if d == DIR_R: r = (self._sx(W-BAND_X), 0, self._sx(W), self._sy(H))
         if not r: return
         if self.canvas is None or self.win is None: return
         try:
@@ -445,23 +650,35 @@ class MiniHUD:
         except Exception:
             return
         try:
-            self.canvas.delete("trace")
-            tlist = list(self.app.trace)
-            if len(tlist) >= 2:
-                x0, y0 = tlist[0]
-                for x1, y1 in tlist[1:]:
-                    self.canvas.create_line(self._sx(x0), self._sy(y0),
-                                            self._sx(x1), self._sy(y1),
-                                            fill="#00AA00", tags="trace")
-                    x0, y0 = x1, y1
+            sc = self.scale
+            coords = [int(v * sc) for v in self.app.get_trace_coords()]
+            if len(coords) >= 4:
+                self.canvas.coords(self._trace_line, *coords)
+            else:
+                self.canvas.coords(self._trace_line, -10, -10, -10, -10)
             # cursor dot
-            self.canvas.delete("cursor")
-            self.canvas.create_oval(self._sx(self.app.vx)-3, self._sy(self.app.vy)-3,
-                                    self._sx(self.app.vx)+3, self._sy(self.app.vy)+3,
-                                    outline="", fill="#00FF00", tags="cursor")
+            cx, cy = self._sx(self.app.vx), self._sy(self.app.vy)
+            self.canvas.coords(self._cursor_dot, cx-3, cy-3, cx+3, cy+3)
         except Exception:
             return
 
+# ----------------------------- Key tokens -----------------------------
+
+# Output-token aliases -> pynput keyboard.Key attribute names
+_SPECIAL = {
+    "esc":"esc","escape":"esc","space":"space","enter":"enter","return":"enter","tab":"tab",
+    "up":"up","down":"down","left":"left","right":"right",
+    "home":"home","end":"end","pageup":"page_up","pagedown":"page_down",
+    "backspace":"backspace","delete":"delete","del":"delete",
+    "ctrl":"ctrl","control":"ctrl","alt":"alt","shift":"shift",
+    "cmd":"cmd","command":"cmd","win":"cmd","meta":"cmd",
+}
+_FKEY_RE = re.compile(r"f([1-9]|1[0-2])")
+_PLUS_RE = re.compile(r"\s*\+\s*")   # chord separator, eats surrounding spaces
+
+# Compiled output script ops (index into App._key_ops)
+_KEY_PRESS, _KEY_TAP, _KEY_RELEASE = 0, 1, 2
+
 # ----------------------------- App / UI -----------------------------
 
 class App:
@@ -494,11 +711,17 @@ class App:
 
         # Keyboard injector
         self.kb = keyboard.Controller() if HAVE_PYNPUT else None
+        # output spec -> compiled key script; specs rarely change, parse once
+        self._chord_cache: dict[str, tuple] = {}
+        self._export_path = CONF_DIR / "macros_export.json"
+        self._key_ops = (self.kb.press, self._tap, self.kb.release) if self.kb else None
 
         # Top bar
         top = ttk.Frame(root); top.pack(fill=tk.X, side=tk.TOP)
         self.pause = tk.BooleanVar(value=False)
-        ttk.Checkbutton(top, text="Pause", variable=self.pause).pack(side=tk.LEFT, padx=6, pady=6)
+        self._paused = False   # plain mirror of self.pause for the listener thread
+        ttk.Checkbutton(top, text="Pause", variable=self.pause, command=self._on_pause_toggle)\
+            .pack(side=tk.LEFT, padx=6, pady=6)
 
         # Mini HUD toggle
         self.var_hud = tk.BooleanVar(value=False)
@@ -528,11 +751,23 @@ class App:
 
         # Info line
         self.info = tk.StringVar(value="")
+        self._info_text = ""
         ttk.Label(self.tab_main, textvariable=self.info).pack(side=tk.TOP, pady=(0,6))
 
+        # Guards engine and virtual cursor: the listener thread drives them, the Tk
+        # thread recenters/reconfigures. Never hold it across a Tk call. The trace
+        # is only touched on the Tk thread.
+        self._lock = threading.Lock()
+        # (dir, None) hits / (None, macro) matches from the listener, shown by _pump
+        self._ui_events = deque()
+
         # Virtual cursor & trace
         self.vx, self.vy = CX, CY
-        self.trace = deque(maxlen=self.store.settings.trace_len)
+        self._trace_alloc(self.store.settings.trace_len)
+        self._trace_line = self.canvas.create_line(CX, CY, CX, CY, fill="#00AA00", tags="trace")
+        self._trace_dirty = True
+        self._last_ui_draw_ns = 0
+        self._inact_ns = self.store.settings.inactivity_reset_ms * 1_000_000
 
         # Engine (create BEFORE any recenter)
         self.engine = GestureEngine(
@@ -540,11 +775,11 @@ class App:
             on_hit=self._on_dir_hit,
             on_match=self._on_macro_match,
         )
+        self._compile_macros(self.store.macros)
         self.engine.set_macros(self.store.macros)
 
         # Global listener infra
         self.global_listener = None
-        self.global_q = queue.Queue()
         self.last_global_xy = None
 
         # Macros & Settings tabs
@@ -560,6 +795,7 @@ class App:
         # Window close & UI refresh
         self.root.protocol("WM_DELETE_WINDOW", self._on_quit)
         self._hud_nudge = 0
+        self._next_pump = self._next_info = _now()
         self.root.after(16, self._pump)
         self.root.after(200, self._refresh_info)
 
@@ -654,11 +890,11 @@ class App:
     # ---------- Apply Settings (cursor GUI only; autosave) ----------
 
     def _apply_settings(self):
-        from collections import deque as _deque
-
         s = self.store.settings
         try:
             new_speed   = float(self.var_speed.get())
+            if not math.isfinite(new_speed):
+                raise ValueError("Speed threshold must be a finite number")
             newW        = max(200, int(self.var_ax.get()))   # cursor GUI width
             newH        = max(200, int(self.var_ay.get()))   # cursor GUI height
             new_rr      = int(self.var_rr.get())
@@ -667,7 +903,7 @@ class App:
             new_req     = bool(self.var_req.get())
             new_inact   = max(50, int(self.var_inact.get()))
         except Exception as ex:
-            messagebox.showerror("Invalid settings", str(ex))
+            _mb().showerror("Invalid settings", str(ex))
             return
 
         # Update settings object
@@ -677,25 +913,24 @@ class App:
         s.trace_len                  = new_trace
         s.require_reset_between_hits = new_req
         s.inactivity_reset_ms        = new_inact
-
-        # Update engine
-        self.engine.update_settings(s)
+        self._inact_ns = new_inact * 1_000_000
 
         # Resize cursor GUI canvas only (do NOT touch outer window geometry here)
         global W, H, CX, CY
         W, H = newW, newH
         CX, CY = W // 2, H // 2
+
+        with self._lock:
+            # Update engine (after W/H so its cached canvas metrics are current)
+            self.engine.update_settings(s)
+        # Reallocate trace ring (recentering below restarts the trace anyway)
+        if new_trace != self._tcap:
+            self._trace_alloc(new_trace)
         try:
             self.canvas.config(width=W, height=H)
         except Exception:
             pass
 
-        # Reallocate/trim trace buffer
-        if len(self.trace) > new_trace:
-            self.trace = _deque(list(self.trace)[-new_trace:], maxlen=new_trace)
-        else:
-            self.trace = _deque(self.trace, maxlen=new_trace)
-
         # Redraw overlays and recenter virtual cursor
         self._draw_static()
         self._recenter_virtual_cursor()
@@ -725,30 +960,78 @@ class App:
         except Exception:
             pass
         rr = self.store.settings.reset_radius_px
-        self.canvas.create_oval(CX-rr, CY-rr, CX+rr, CY+rr,
-                                outline="#00FF00", width=2, tags="static")
-        self.canvas.create_rectangle(0, 0, W, BAND_Y, outline="", fill="#003300", tags="static")          # top
-        self.canvas.create_rectangle(0, H-BAND_Y, W, H, outline="", fill="#003300", tags="static")        # bottom
-        self.canvas.create_rectangle(0, 0, BAND_X, H, outline="", fill="#003300", tags="static")          # left
-        self.canvas.create_rectangle(W-BAND_X, 0, W, H, outline="", fill="#003300", tags="static")        # right
+        bands = (
+            (0, 0, W, BAND_Y),          # top
+            (0, H-BAND_Y, W, H),        # bottom
+            (0, 0, BAND_X, H),          # left
+            (W-BAND_X, 0, W, H),        # right
+        )
+        self._bg_image = _static_overlay_image(W, H, CX, CY, rr, bands)
+        self.canvas.create_image(0, 0, anchor="nw", image=self._bg_image, tags="static")
+        self.canvas.tag_lower("static")   # trace polyline stays on top
         if getattr(self, "hud", None):
             self.hud.update_dimensions()
 
+    def _trace_alloc(self, n: int):
+        # Trace ring: flat interleaved [x0, y0, x1, y1, ...] of n points, so the
+        # canvas coords list is at most two slices. _th is the next x slot.
+        # At least one slot: trace_len can be 0 in a hand-edited config.
+        n = max(1, int(n))
+        self._txy = [0] * (2 * n)
+        self._tcap = n
+        self._th = 0
+        self._tn = 0
+        self._trace_flat = None
+        self._trace_last = None
+
+    def trace_append(self, x, y):
+        buf, i = self._txy, self._th
+        buf[i] = x; buf[i+1] = y
+        i += 2
+        self._th = 0 if i == len(buf) else i
+        if self._tn < self._tcap:
+            self._tn += 1
+        self._trace_last = (x, y)
+        self._trace_dirty = True
+        self._trace_flat = None
+
+    def _trace_clear(self):
+        self._th = 0
+        self._tn = 0
+        self._trace_last = None
+        self._trace_dirty = True
+        self._trace_flat = None
+
+    def get_trace_coords(self) -> list:
+        """
+        Trace points oldest-first as a flat [x0, y0, x1, y1, ...] list, shared by
+        the main canvas and the HUD. Cached until the trace changes; don't mutate.
+        """
+        flat = self._trace_flat
+        if flat is None:
+            buf, i = self._txy, self._th
+            if self._tn < self._tcap:
+                flat = buf[:i]   # not wrapped yet: oldest point is slot 0
+            else:
+                flat = buf[i:] + buf[:i]
+            self._trace_flat = flat
+        return flat
+
     def _draw_trace(self):
-        if len(self.trace) < 2:
+        # One persistent polyline; move its points instead of recreating items.
+        coords = self.get_trace_coords()
+        if len(coords) < 4:
+            self.canvas.coords(self._trace_line, -10, -10, -10, -10)
             return
-        x0, y0 = self.trace[0]
-        for x1, y1 in list(self.trace)[1:]:
-            self.canvas.create_line(x0, y0, x1, y1, fill="#00AA00", tags="trace")
-            x0, y0 = x1, y1
+        self.canvas.coords(self._trace_line, *coords)
 
     def _flash_edge(self, d):
         color = "#77FF77"
         r = None
-        if d == "U": r = (0, 0, W, BAND_Y)
-        if d == "D": r = (0, H-BAND_Y, W, H)
-        if d == "L": r = (0, 0, BAND_X, H)
-        if d == "R": r = (W-BAND_X, 0, W, H)
+        if d == DIR_U: r = (0, 0, W, BAND_Y)
+        if d == DIR_D: r = (0, H-BAND_Y, W, H)
+        if d == DIR_L: r = (0, 0, BAND_X, H)
+        if d == DIR_R: r = (W-BAND_X, 0, W, H)
         if not r: return
         rid = self.canvas.create_rectangle(*r, outline="", fill=color, stipple="gray50")
         self.root.after(120, lambda: self.canvas.delete(rid))
@@ -765,7 +1048,23 @@ class App:
             self.global_listener = None
 
         def on_move(x, y):
-            self.global_q.put((time.time(), x, y))  # (t, x, y)
+            # Listener thread: run the engine right here instead of waiting for
+            # the next Tk pump. The engine sees every event; the trace only gets
+            # the per-frame position (see _pump). No Tk calls in this path.
+            t = _now()
+            if self._paused:
+                self.last_global_xy = None   # resume without a jump
+                return
+            with self._lock:
+                last = self.last_global_xy
+                self.last_global_xy = (x, y)
+                if last is None:
+                    return
+                nx = self.vx + x - last[0]
+                ny = self.vy + y - last[1]
+                self.vx = nx if 0 <= nx < W else (0 if nx < 0 else W - 1)
+                self.vy = ny if 0 <= ny < H else (0 if ny < 0 else H - 1)
+                self.engine.push(t, self.vx, self.vy)
 
         self.global_listener = mouse.Listener(on_move=on_move)
         self.global_listener.start()
@@ -790,22 +1089,27 @@ class App:
     def _recenter_virtual_cursor(self):
         global CX, CY
         CX, CY = W // 2, H // 2
-        self.vx, self.vy = CX, CY
-        self.trace.clear()
-        self.trace.append((self.vx, self.vy))
-        self.engine.reset(time.time())
-        t0 = time.time()
-        self.engine.push(t0, CX, CY)
-        self.engine.push(t0 + 0.01, CX, CY)
+        with self._lock:
+            self.vx, self.vy = CX, CY
+            t0 = _now()
+            self.engine.reset(t0)
+            self.engine.push(t0, CX, CY)
+            self.engine.push(t0 + 10_000_000, CX, CY)
+        self._trace_clear()
+        self.trace_append(CX, CY)
         if self.hud:
             self.hud.update_dimensions()
 
+    def _on_pause_toggle(self):
+        self._paused = bool(self.pause.get())
+
     # ---------- Mini HUD toggle ----------
 
     def _toggle_hud(self):
         if self.var_hud.get():
             if not self.hud:
                 self.hud = MiniHUD(self)
+                self._trace_dirty = True
         else:
             if self.hud:
                 self.hud.destroy()
@@ -814,32 +1118,56 @@ class App:
     # ---------- Pump loop ----------
 
     def _pump(self):
-        if not self.pause.get() and self.store.settings.use_global_mouse and HAVE_PYNPUT:
-            try:
-                while True:
-                    t, x, y = self.global_q.get_nowait()
-                    if self.last_global_xy is None:
-                        self.last_global_xy = (x, y)
-                        continue
-                    dx = x - self.last_global_xy[0]
-                    dy = y - self.last_global_xy[1]
-                    self.last_global_xy = (x, y)
-
-                    self.vx = max(0, min(W-1, self.vx + dx))
-                    self.vy = max(0, min(H-1, self.vy + dy))
-                    self.trace.append((self.vx, self.vy))
-                    self.engine.push(t, self.vx, self.vy)
-            except queue.Empty:
-                pass
-
-        now = time.time()
-        inact_ms = self.store.settings.inactivity_reset_ms
-        last_delib = self.engine.last_above_threshold_ts or 0.0
-        if (now - last_delib) * 1000.0 >= inact_ms:
-            if abs(self.vx - CX) > 1 or abs(self.vy - CY) > 1:
+        # Detection already ran on the listener thread; just show its results.
+        ev = self._ui_events
+        if ev:
+            popleft, status_set = ev.popleft, self.status.set
+            for _ in range(len(ev)):
+                d, m = popleft()
+                if m is None:
+                    self._flash_edge(d)
+                    status_set(f"Hit: {DIR_CHARS[d]}")
+                else:
+                    status_set(f"Macro: {m.name or ''.join(m.pattern)} -> {m.key}")
+
+        # Trace is coalesced per frame: one point for wherever the cursor ended up,
+        # since intermediate positions would never be seen between redraws anyway.
+        vx, vy = self.vx, self.vy
+        if (vx, vy) != self._trace_last:
+            self.trace_append(vx, vy)
+
+        now = _now()
+        if now - self.engine.last_above_threshold_ts >= self._inact_ns:
+            if not (-1 <= vx - CX <= 1 and -1 <= vy - CY <= 1):
                 self._recenter_virtual_cursor()
 
-        self.canvas.delete("trace")
+        if self._trace_dirty and now - self._last_ui_draw_ns > UI_REDRAW_NS:
+            self._redraw_ui(now)
+        if self.hud:
+            self._hud_nudge -= 1
+            if self._hud_nudge <= 0:
+                # ~1 s, randomized so it doesn't line up with other periodic work
+                self._hud_nudge = random.randint(50, 70)
+                try:
+                    self.hud.nudge_front()
+                except Exception:
+                    pass
+
+        self._next_pump = self._reschedule(self._next_pump, PUMP_NS, self._pump)
+
+    def _reschedule(self, deadline: int, period: int, fn) -> int:
+        # Absolute deadlines so the cadence doesn't drift by each handler's
+        # runtime; if we fall >3 periods behind, snap forward instead of bursting.
+        now = _now()
+        deadline += period
+        if now - deadline > 3 * period:
+            deadline = now + period
+        self.root.after(max(0, (deadline - now) // 1_000_000), fn)
+        return deadline
+
+    def _redraw_ui(self, now: int):
+        self._last_ui_draw_ns = now
+        self._trace_dirty = False
         self._draw_trace()
         if self.hud:
             try:
@@ -848,32 +1176,27 @@ class App:
                 try: self.var_hud.set(False)
                 except Exception: pass
                 self.hud = None
-            else:
-                self._hud_nudge = (self._hud_nudge + 1) % 60
-                if self._hud_nudge == 0:
-                    try:
-                        self.hud.nudge_front()
-                    except Exception:
-                        pass
-
-        self.root.after(16, self._pump)
 
     def _refresh_info(self):
         e = self.engine
-        self.info.set(
-            f"Speed(med)={int(e.speed_median)} px/s   Dir={e.last_dir or '-'}   Seq={''.join(e.seq)}"
-        )
-        self.root.after(200, self._refresh_info)
+        d = e.last_dir
+        seq = "".join(DIR_CHARS[c] for c in tuple(e.seq))   # snapshot: listener appends
+        text = f"Speed(med)={int(e.speed_median)} px/s   Dir={DIR_CHARS[d] if d is not None else '-'}   Seq={seq}"
+        if text != self._info_text:   # idle: skip the Tcl var write and label relayout
+            self._info_text = text
+            self.info.set(text)
+        # ±10% jitter keeps this from settling onto the same frames as the pump.
+        period = int(INFO_NS * random.uniform(0.9, 1.1))
+        self._next_info = self._reschedule(self._next_info, period, self._refresh_info)
 
-    # ---------- Engine callbacks ----------
+    # ---------- Engine callbacks (listener thread) ----------
 
-    def _on_dir_hit(self, d: str):
-        self._flash_edge(d)
-        self.status.set(f"Hit: {d}")
+    def _on_dir_hit(self, d: int):
+        self._ui_events.append((d, None))
 
     def _on_macro_match(self, m: Macro):
-        self.status.set(f"Macro: {m.name or ''.join(m.pattern)} -> {m.key}")
-        self._send_keys(m.key)
+        self._send_keys(m)   # inject immediately; only the status waits for Tk
+        self._ui_events.append((None, m))
 
     # ---------- Key injection: chords & chains ----------
 
@@ -881,20 +1204,12 @@ class App:
         """Map token to pynput key or char."""
         if not HAVE_PYNPUT or self.kb is None:
             return None
-        t = tok.lower().strip()
-        special = {
-            "esc":"esc","escape":"esc","space":"space","enter":"enter","return":"enter","tab":"tab",
-            "up":"up","down":"down","left":"left","right":"right",
-            "home":"home","end":"end","pageup":"page_up","pagedown":"page_down",
-            "backspace":"backspace","delete":"delete","del":"delete",
-            "ctrl":"ctrl","control":"ctrl","alt":"alt","shift":"shift",
-            "cmd":"cmd","command":"cmd","win":"cmd","meta":"cmd",
-        }
-        fkey = re.fullmatch(r"f([1-9]|1[0-2])", t)
+        t = tok.lower()   # already stripped by _parse_output
+        fkey = _FKEY_RE.fullmatch(t)
         if fkey:
             return getattr(keyboard.Key, f"f{fkey.group(1)}")
-        if t in special:
-            return getattr(keyboard.Key, special[t])
+        if t in _SPECIAL:
+            return getattr(keyboard.Key, _SPECIAL[t])
         if len(t) == 1:
             return t  # printable char
         return t
@@ -911,61 +1226,83 @@ class App:
             part = part.strip()
             if not part:
                 continue
-            toks = [self._token_to_key(t) for t in part.split("+")]
+            toks = [self._token_to_key(t) for t in _PLUS_RE.split(part)]
             toks = [t for t in toks if t is not None]
             if toks:
                 chords.append(toks)
         return chords
 
-    def _send_keys(self, spec: str):
+    def _compile_output(self, spec: str) -> tuple:
+        """
+        Flat key script for spec: ((op, key), ...) with op one of _KEY_PRESS /
+        _KEY_TAP / _KEY_RELEASE, modifiers wrapped around each chord's keys.
+        Cached by spec.
+        """
         if not HAVE_PYNPUT or self.kb is None:
-            return
-        chords = self._parse_output(spec)
-
-        def is_mod(k):
-            return k in (keyboard.Key.ctrl, keyboard.Key.alt, keyboard.Key.shift, keyboard.Key.cmd)
-
-        for chord in chords:
-            mods = [k for k in chord if isinstance(k, keyboard.Key) and is_mod(k)]
-            mains = [k for k in chord if k not in mods]
-            for k in mods:
-                try: self.kb.press(k)
-                except Exception: pass
-            for k in mains:
-                try:
-                    self.kb.press(k); self.kb.release(k)
-                except Exception:
-                    if isinstance(k, str) and len(k) == 1:
-                        try: self.kb.press(k); self.kb.release(k)
-                        except Exception: pass
-            for k in reversed(mods):
-                try: self.kb.release(k)
+            return ()
+        script = self._chord_cache.get(spec)
+        if script is None:
+            mod_keys = (keyboard.Key.ctrl, keyboard.Key.alt, keyboard.Key.shift, keyboard.Key.cmd)
+            ops = []
+            for chord in self._parse_output(spec):
+                mods = [k for k in chord if isinstance(k, keyboard.Key) and k in mod_keys]
+                ops += [(_KEY_PRESS, k) for k in mods]
+                ops += [(_KEY_TAP, k) for k in chord if k not in mods]
+                ops += [(_KEY_RELEASE, k) for k in reversed(mods)]
+            script = self._chord_cache[spec] = tuple(ops)
+        return script
+
+    def _compile_macros(self, macros):
+        # Resolve keys at bind time so firing a macro does no parsing at all.
+        for m in macros:
+            m._compiled = self._compile_output(m.key)
+
+    def _tap(self, k):
+        try:
+            self.kb.press(k); self.kb.release(k)
+        except Exception:
+            if isinstance(k, str) and len(k) == 1:
+                try: self.kb.press(k); self.kb.release(k)
                 except Exception: pass
 
+    def _send_keys(self, m: Macro):
+        if not HAVE_PYNPUT or self.kb is None:
+            return
+        script = m._compiled
+        if script is None:
+            script = m._compiled = self._compile_output(m.key)
+        key_ops = self._key_ops
+        for op, k in script:
+            try: key_ops[op](k)
+            except Exception: pass
+
 
     # ---------- Macros CRUD ----------
 
     def _refresh_mlist(self):
-        self.mlist.delete(0, tk.END)
+        lines = []
         for i, m in enumerate(self.store.macros):
-            label = m.name or "".join(m.pattern)
-            self.mlist.insert(
-                tk.END,
-                f"{i+1:02d}. {''.join(m.pattern):<8} -> {m.key:<20}  {label}"
-            )
+            pat = "".join(m.pattern)
+            lines.append(f"{i+1:02d}. {pat:<8} -> {m.key:<20}  {m.name or pat}")
+        self.mlist.delete(0, tk.END)
+        if lines:
+            self.mlist.insert(tk.END, *lines)   # one Tcl call for the whole list
 
     def _add_macro(self):
-        pat = [c for c in self.build_seq.get().upper() if c in "URDL"]
+        pat = list(_NOT_DIR_RE.sub("", self.build_seq.get().upper()))
         if not pat:
-            messagebox.showwarning("Invalid", "Pattern must contain U/R/D/L.")
+            _mb().showwarning("Invalid", "Pattern must contain U/R/D/L.")
             return
         key = self.build_key.get().strip()
         if not key:
-            messagebox.showwarning("Invalid", "Output cannot be empty.")
+            _mb().showwarning("Invalid", "Output cannot be empty.")
             return
         name = self.build_name.get().strip()
-        self.store.macros.append(Macro(pattern=pat, key=key, name=name))
-        self.engine.set_macros(self.store.macros)
+        m = Macro(pattern=pat, key=key, name=name)
+        self._compile_macros([m])
+        self.store.macros.append(m)
+        with self._lock:
+            self.engine.set_macros(self.store.macros)
         self._refresh_mlist()
         self.build_seq.set("")
         try:
@@ -980,7 +1317,8 @@ class App:
             return
         idx = sel[0]
         del self.store.macros[idx]
-        self.engine.set_macros(self.store.macros)
+        with self._lock:
+            self.engine.set_macros(self.store.macros)
         self._refresh_mlist()
         try:
             self.store.save()
@@ -989,20 +1327,21 @@ class App:
         self.status.set("Macro deleted")
 
     def _export_macros(self):
-        path = CONF_DIR / "macros_export.json"
-        data = [asdict(m) for m in self.store.macros]
-        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        path = self._export_path
+        path.write_bytes(_dumps([_macro_to_dict(m) for m in self.store.macros]))
         self.status.set(f"Exported -> {path}")
 
     def _import_macros(self):
-        path = CONF_DIR / "macros_export.json"
+        path = self._export_path
         if not path.exists():
-            messagebox.showwarning("Missing file", f"{path} not found")
+            _mb().showwarning("Missing file", f"{path} not found")
             return
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
+            data = _loads(path.read_bytes())
             self.store.macros = [Macro(**m) for m in data]
-            self.engine.set_macros(self.store.macros)
+            self._compile_macros(self.store.macros)
+            with self._lock:
+                self.engine.set_macros(self.store.macros)
             self._refresh_mlist()
             try:
                 self.store.save()
@@ -1010,7 +1349,7 @@ class App:
                 pass
             self.status.set("Imported macros")
         except Exception as ex:
-            messagebox.showerror("Import failed", str(ex))
+            _mb().showerror("Import failed", str(ex))
 
 # ----------------------------- Main -----------------------------
 